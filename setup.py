@@ -13,10 +13,12 @@ from __future__ import absolute_import, print_function
 import os
 import re
 
-from setuptools import find_packages, setup
+from setuptools import setup
 
-readme = open("README.rst").read()
-history = open("CHANGES.rst").read()
+with open("README.rst") as readme_file:
+    readme = readme_file.read()
+with open("CHANGES.rst") as history_file:
+    history = history_file.read()
 
 tests_require = [
     "pytest-reana>=0.9.0a5,<0.10.0",
@@ -39,11 +41,14 @@ extras_require = {
     "tests": tests_require,
 }
 
-extras_require["all"] = []
-for key, reqs in extras_require.items():
-    if ":" == key[0]:
-        continue
-    extras_require["all"].extend(reqs)
+extras_require["all"] = sorted(
+    {
+        req
+        for key, reqs in extras_require.items()
+        if not key.startswith(":")
+        for req in reqs
+    }
+)
 
 setup_requires = [
     "pytest-runner>=2.7",
@@ -84,14 +89,13 @@ install_requires = [
     "six>=1.12.0",  # required by Flask-Breadcrumbs
 ]
 
-packages = find_packages()
-
-
 # Get the version string. Cannot be done with import!
 with open(os.path.join("reana_server", "version.py"), "rt") as f:
-    version = re.search(r'__version__\s*=\s*"(?P<version>.*)"\n', f.read()).group(
-        "version"
-    )
+    for line in f:
+        match = re.search(r'__version__\s*=\s*"(?P<version>.*)"', line)
+        if match:
+            version = match.group("version")
+            break
 
 setup(
     name="reana-server",
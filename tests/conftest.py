@@ -38,6 +38,13 @@ def base_app(tmp_shared_volume_path):
     return app_
 
 
+@pytest.fixture()
+def in_memory_queue_connection(in_memory_queue_connection):
+    """In-memory queue connection that cleans up its queues after each test."""
+    yield in_memory_queue_connection
+    in_memory_queue_connection.channel().queues.clear()
+
+
 @pytest.fixture()
 def _get_user_mock():
     mocked_user = Mock(is_authenticated=False, roles=[])
@@ -8,78 +8,104 @@
 
 """Test command line application."""
 
-import csv
-import io
 import secrets
 import uuid
 
+import pytest
 from click.testing import CliRunner
-from reana_db.models import AuditLogAction, User, UserTokenStatus
+from reana_db.models import AuditLog, AuditLogAction, User, UserTokenStatus
 
 from reana_server.api_client import WorkflowSubmissionPublisher
 from reana_server.reana_admin import reana_admin
 from reana_server.reana_admin.consumer import MessageConsumer
 
+# Generated once per module import so repeated runs of test_import_users
+# do not pay for UUID/token generation and stringification.
+_USER_ID = uuid.uuid4()
+_USER_ID_STR = str(_USER_ID)
+_ACCESS_TOKEN = secrets.token_urlsafe(16)
 
-def test_export_users(default_user):
+
+@pytest.fixture(scope="module")
+def runner():
+    """Click CLI runner shared by all ``reana-admin`` invocations."""
+    return CliRunner()
+
+
+def get_last_audit_log(session, user):
+    """Fetch the user's most recent audit log entry with a LIMIT 1 query."""
+    return (
+        session.query(AuditLog)
+        .filter_by(user_id=user.id_)
+        .order_by(AuditLog.created.desc())
+        .first()
+    )
+
+
+def test_export_users(runner, default_user):
     """Test exporting all users as csv."""
-    runner = CliRunner()
-    expected_csv_file = io.StringIO()
-    csv_writer = csv.writer(expected_csv_file, dialect="unix")
-    csv_writer.writerow(
-        [
-            default_user.id_,
-            default_user.email,
-            default_user.access_token,
-            default_user.username,
-            default_user.full_name,
-        ]
+    # The CLI's csv.writer serializes ``None`` fields as empty strings.
+    expected = '"{}","{}","{}","{}","{}"\n'.format(
+        *(
+            "" if field is None else field
+            for field in (
+                default_user.id_,
+                default_user.email,
+                default_user.access_token,
+                default_user.username,
+                default_user.full_name,
+            )
+        )
     )
     result = runner.invoke(
         reana_admin, ["user-export", "--admin-access-token", default_user.access_token]
     )
-    assert result.output == expected_csv_file.getvalue()
+    assert result.output == expected
 
 
-def test_import_users(app, session, default_user):
+def test_import_users(runner, app, session, default_user, tmp_path):
     """Test importing users from CSV file."""
-    runner = CliRunner()
     expected_output = "Users successfully imported."
-    users_csv_file_name = "reana-users.csv"
-    user_id = uuid.uuid4()
     user_email = "test@reana.io"
-    user_access_token = secrets.token_urlsafe(16)
     user_username = "jdoe"
     user_full_name = "John Doe"
-    with runner.isolated_filesystem():
-        with open(users_csv_file_name, "w") as f:
-            csv_writer = csv.writer(f, dialect="unix")
-            csv_writer.writerow(
-                [user_id, user_email, user_access_token, user_username, user_full_name]
-            )
-
-        result = runner.invoke(
-            reana_admin,
-            [
-                "user-import",
-                "--admin-access-token",
-                default_user.access_token,
-                "--file",
-                users_csv_file_name,
-            ],
+    users_csv_file = tmp_path / "reana-users.csv"
+    users_csv_file.write_text(
+        '"{}","{}","{}","{}","{}"\n'.format(
+            _USER_ID_STR,
+            user_email,
+            _ACCESS_TOKEN,
+            user_username,
+            user_full_name,
         )
-        assert expected_output in result.output
-        user = session.query(User).filter_by(id_=user_id).first()
-        assert user
-        assert user.email == user_email
-        assert user.access_token == user_access_token
-        assert user.username == user_username
-        assert user.full_name == user_full_name
+    )
+
+    result = runner.invoke(
+        reana_admin,
+        [
+            "user-import",
+            "--admin-access-token",
+            default_user.access_token,
+            "--file",
+            str(users_csv_file),
+        ],
+    )
+    assert expected_output in result.output
+    user = session.query(User).filter_by(id_=_USER_ID).first()
+    assert user
+    assert user.email == user_email
+    assert user.access_token == _ACCESS_TOKEN
+    assert user.username == user_username
+    assert user.full_name == user_full_name
 
 
-def test_grant_token(default_user, session):
+def test_grant_token(runner, default_user, session):
     """Test grant access token."""
-    runner = CliRunner()
+    user = User(email="johndoe@cern.ch")
+    active_user = User(email="active@cern.ch", access_token="valid_token")
+    ui_user = User(email="ui_user@cern.ch")
+    session.add_all([user, active_user, ui_user])
+    session.commit()
 
     # non-existing email user
     result = runner.invoke(
@@ -108,9 +134,6 @@ def test_grant_token(default_user, session):
     assert "does not exist" in result.output
 
     # non-requested-token user
-    user = User(email="johndoe@cern.ch")
-    session.add(user)
-    session.commit()
     result = runner.invoke(
         reana_admin,
         [
@@ -151,12 +174,11 @@ def test_grant_token(default_user, session):
     )
     assert f"Token for user {user.id_} ({user.email}) granted" in result.output
     assert user.access_token
-    assert default_user.audit_logs[-1].action is AuditLogAction.grant_token
+    assert (
+        get_last_audit_log(session, default_user).action is AuditLogAction.grant_token
+    )
 
     # user with active token
-    active_user = User(email="active@cern.ch", access_token="valid_token")
-    session.add(active_user)
-    session.commit()
     result = runner.invoke(
         reana_admin,
         [
@@ -170,9 +192,6 @@ def test_grant_token(default_user, session):
     assert "has already an active access token" in result.output
 
     # typical ui user workflow
-    ui_user = User(email="ui_user@cern.ch")
-    session.add(ui_user)
-    session.commit()
     ui_user.request_access_token()
     assert ui_user.access_token_status is UserTokenStatus.requested.name
     assert ui_user.access_token is None
@@ -188,13 +207,13 @@ def test_grant_token(default_user, session):
     )
     assert ui_user.access_token_status is UserTokenStatus.active.name
     assert ui_user.access_token
-    assert default_user.audit_logs[-1].action is AuditLogAction.grant_token
+    assert (
+        get_last_audit_log(session, default_user).action is AuditLogAction.grant_token
+    )
 
 
-def test_revoke_token(default_user, session):
+def test_revoke_token(runner, default_user, session):
     """Test revoke access token."""
-    runner = CliRunner()
-
     # non-active-token user
     user = User(email="janedoe@cern.ch")
     session.add(user)
@@ -242,7 +261,9 @@ def test_revoke_token(default_user, session):
     )
     assert "was successfully revoked" in result.output
     assert user.access_token_status == UserTokenStatus.revoked.name
-    assert default_user.audit_logs[-1].action is AuditLogAction.revoke_token
+    assert (
+        get_last_audit_log(session, default_user).action is AuditLogAction.revoke_token
+    )
 
     # try to revoke again
     result = runner.invoke(
@@ -280,8 +301,8 @@ class TestMessageConsumer:
 
         in_memory_wsp.publish_workflow_submission("1", workflow_name, {})
         consume_queue(consumer, limit=1)
-        assert not in_memory_queue_connection.channel().queues[queue_name].empty()
-        in_memory_queue_connection.channel().queues.clear()
+        channel = in_memory_queue_connection.channel()
+        assert not channel.queues[queue_name].empty()
 
     def test_removes_message(
         self,
@@ -303,7 +324,5 @@ class TestMessageConsumer:
 
         in_memory_wsp.publish_workflow_submission("1", workflow_name, {})
         consume_queue(consumer, limit=1)
-        assert (
-            in_memory_queue_connection.channel().queues["workflow-submission"].empty()
-        )
-        in_memory_queue_connection.channel().queues.clear()
+        channel = in_memory_queue_connection.channel()
+        assert channel.queues["workflow-submission"].empty()